@@ -4,22 +4,35 @@ import json
 import os
 import random
 import shutil
+import sqlite3
 import tempfile
-import time
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
 
+import orjson
 from flask import Flask, Response, jsonify, render_template, request, send_file
 
-from audio_utils import convert_to_cd_wav, get_duration
+from audio_utils import (
+    cd_pcm_size,
+    convert_to_cd_wav,
+    get_duration,
+    get_exact_duration,
+    start_cd_pcm_stream,
+)
 from cd_utils import DEFAULT_CAPACITY_SECONDS, burn_cd, get_cd_capacity
 from url_downloader import (
     DownloadJob,
+    DownloadResult,
     JobStatus,
     cleanup_job,
     get_job,
+    job_update_version,
     parse_urls,
     start_download,
+    wait_for_job_update,
 )
 
 app = Flask(__name__)
@@ -29,83 +42,176 @@ XDG_DATA_HOME = os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/sha
 DATA_DIR = Path(XDG_DATA_HOME) / "burping-slugs"
 FILES_DIR = DATA_DIR / "files"
 CACHE_DIR = DATA_DIR / "cache"
-PLAYLIST_FILE = DATA_DIR / "playlist.json"
+PLAYLIST_DB = DATA_DIR / "playlist.db"
+LEGACY_PLAYLIST_FILE = DATA_DIR / "playlist.json"
 
 # Ensure directories exist
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 FILES_DIR.mkdir(parents=True, exist_ok=True)
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
-# Temporary directory for WAV conversion (not persisted)
-wav_dir = Path(tempfile.mkdtemp(prefix="cd-burner-wav-"))
+# Spare room to leave on tmpfs beyond a burn's WAV files
+SCRATCH_HEADROOM_BYTES = 64 * 1024 * 1024
+
+
+def _scratch_parent(needed_bytes: int) -> str | None:
+    """Pick where to put a burn's WAV scratch files.
+
+    Honours CD_BURNER_SCRATCH_DIR, otherwise prefers tmpfs (/dev/shm) when it
+    currently has room for needed_bytes, else the system temp dir.
+    """
+    configured = os.environ.get("CD_BURNER_SCRATCH_DIR")
+    if configured:
+        return configured
+    shm = "/dev/shm"
+    try:
+        if os.path.isdir(shm) and shutil.disk_usage(shm).free >= needed_bytes + SCRATCH_HEADROOM_BYTES:
+            return shm
+    except OSError:
+        pass
+    return None
+
 
-# In-memory track storage (loaded from disk on startup)
+# In-memory track storage (loaded from disk on startup). The list holds
+# playlist order; tracks_by_id indexes the same dicts for O(1) lookup.
 tracks: list[dict] = []
+tracks_by_id: dict[str, dict] = {}
+# Guards track mutations (downloads are added from worker threads)
+_tracks_lock = threading.Lock()
 
-# Playlist schema version
+# Playlist schema version (stored as the database's user_version)
 PLAYLIST_VERSION = 1
 
+_db_lock = threading.Lock()
 
-def load_playlist() -> None:
-    """Load playlist from disk on startup."""
-    global tracks
-    if not PLAYLIST_FILE.exists():
-        tracks = []
+
+def _open_db() -> sqlite3.Connection:
+    """Open the playlist database, creating the schema if needed."""
+    conn = sqlite3.connect(PLAYLIST_DB, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tracks ("
+            "id TEXT PRIMARY KEY, pos INTEGER NOT NULL, name TEXT NOT NULL, "
+            "duration REAL NOT NULL, filename TEXT NOT NULL, source_url TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS tracks_pos ON tracks(pos)")
+        conn.execute(f"PRAGMA user_version={PLAYLIST_VERSION}")
+    return conn
+
+
+_db = _open_db()
+
+
+def _set_tracks(new_tracks: list[dict]) -> None:
+    """Replace the in-memory track list and rebuild the id index."""
+    global tracks, tracks_by_id
+    tracks = new_tracks
+    tracks_by_id = {t["id"]: t for t in new_tracks}
+
+
+def _db_insert(track: dict) -> None:
+    """Persist a track at the end of the playlist."""
+    with _db_lock, _db:
+        _db.execute(
+            "INSERT OR REPLACE INTO tracks (id, pos, name, duration, filename, source_url) "
+            "VALUES (?, (SELECT COALESCE(MAX(pos), -1) + 1 FROM tracks), ?, ?, ?, ?)",
+            (track["id"], track["name"], track["duration"],
+             Path(track["filepath"]).name, track.get("source_url")),
+        )
+
+
+def _db_delete(track_ids: list[str]) -> None:
+    """Remove tracks from the database."""
+    with _db_lock, _db:
+        _db.executemany("DELETE FROM tracks WHERE id = ?", [(tid,) for tid in track_ids])
+
+
+def _add_track(track: dict) -> None:
+    """Append a track to the playlist, index it and persist it."""
+    with _tracks_lock:
+        _db_insert(track)
+        tracks.append(track)
+        tracks_by_id[track["id"]] = track
+
+
+def _migrate_json_playlist() -> None:
+    """Import tracks from the old playlist.json into the database (once)."""
+    if not LEGACY_PLAYLIST_FILE.exists():
         return
 
     try:
-        with open(PLAYLIST_FILE) as f:
+        with open(LEGACY_PLAYLIST_FILE) as f:
             data = json.load(f)
 
-        if data.get("version") != PLAYLIST_VERSION:
-            # Future: handle migrations
-            tracks = []
-            return
+        if data.get("version") == 1:
+            with _db_lock, _db:
+                _db.executemany(
+                    "INSERT OR IGNORE INTO tracks (id, pos, name, duration, filename, source_url) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (t["id"], pos, t["name"], t["duration"], t["filename"], t.get("source_url"))
+                        for pos, t in enumerate(data.get("tracks", []))
+                    ],
+                )
+        LEGACY_PLAYLIST_FILE.rename(LEGACY_PLAYLIST_FILE.with_suffix(".json.migrated"))
+    except (json.JSONDecodeError, OSError, KeyError, sqlite3.Error):
+        pass
+
+
+def load_playlist() -> None:
+    """Load playlist from the database on startup."""
+    _migrate_json_playlist()
+
+    with _db_lock:
+        rows = _db.execute(
+            "SELECT id, name, duration, filename, source_url FROM tracks ORDER BY pos"
+        ).fetchall()
+
+    # One directory read instead of a stat() per track
+    existing = {entry.name for entry in os.scandir(FILES_DIR)}
+
+    loaded_tracks = []
+    missing = []
+    for track_id, name, duration, filename, source_url in rows:
+        if filename in existing:
+            filepath = FILES_DIR / filename
+            loaded_tracks.append({
+                "id": track_id,
+                "name": name,
+                "duration": duration,
+                "filepath": str(filepath),
+                "source_url": source_url,
+            })
+        else:
+            missing.append(track_id)
+
+    if missing:
+        _db_delete(missing)
+    _set_tracks(loaded_tracks)
 
-        loaded_tracks = []
-        for t in data.get("tracks", []):
-            filepath = FILES_DIR / t["filename"]
-            if filepath.exists():
-                loaded_tracks.append({
-                    "id": t["id"],
-                    "name": t["name"],
-                    "duration": t["duration"],
-                    "filepath": str(filepath),
-                    "source_url": t.get("source_url"),
-                })
-        tracks = loaded_tracks
-    except (json.JSONDecodeError, OSError, KeyError):
-        tracks = []
-
-
-def save_playlist() -> None:
-    """Save playlist to disk."""
-    data = {
-        "version": PLAYLIST_VERSION,
-        "tracks": [
-            {
-                "id": t["id"],
-                "name": t["name"],
-                "duration": t["duration"],
-                "filename": Path(t["filepath"]).name,
-                "source_url": t.get("source_url"),
-            }
-            for t in tracks
-        ],
-    }
-    with open(PLAYLIST_FILE, "w") as f:
-        json.dump(data, f, indent=2)
 
+def save_order() -> None:
+    """Persist the current track order."""
+    with _db_lock, _db:
+        _db.executemany(
+            "UPDATE tracks SET pos = ? WHERE id = ?",
+            [(pos, t["id"]) for pos, t in enumerate(tracks)],
+        )
 
-def sse_event(data: dict, event: str = None) -> str:
+
+def sse_event(data: dict, event: str = None) -> bytes:
     """Format data as SSE event."""
-    lines = []
+    buf = bytearray()
     if event:
-        lines.append(f"event: {event}")
-    lines.append(f"data: {json.dumps(data)}")
-    lines.append("")
-    lines.append("")
-    return "\n".join(lines)
+        buf += b"event: "
+        buf += event.encode()
+        buf += b"\n"
+    buf += b"data: "
+    buf += orjson.dumps(data)
+    buf += b"\n\n"
+    return bytes(buf)
 
 
 # Load playlist on startup
@@ -118,9 +224,41 @@ def index():
     return render_template("index.html")
 
 
+# Chunk size for streamed uploads
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _new_upload_path(filename: str) -> tuple[str, Path]:
+    """Allocate a track ID and storage path for an uploaded file."""
+    track_id = str(uuid.uuid4())
+    ext = Path(filename).suffix or ".audio"
+    return track_id, FILES_DIR / f"{track_id}{ext}"
+
+
+def _register_upload(track_id: str, filepath: Path, name: str) -> dict | None:
+    """Add a saved upload to the playlist.
+
+    Returns:
+        Public track info, or None if the file isn't valid audio (it is removed)
+    """
+    duration = get_duration(filepath)
+    if duration is None:
+        filepath.unlink()  # Remove invalid file
+        return None
+
+    _add_track({
+        "id": track_id,
+        "name": name,
+        "duration": duration,
+        "filepath": str(filepath),
+        "source_url": None,
+    })
+    return {"id": track_id, "name": name, "duration": duration}
+
+
 @app.route("/upload", methods=["POST"])
 def upload():
-    """Handle file uploads. Returns list of track info."""
+    """Handle multipart file uploads. Returns list of track info."""
     if "files" not in request.files:
         return jsonify({"error": "No files provided"}), 400
 
@@ -131,36 +269,42 @@ def upload():
         if not file.filename:
             continue
 
-        # Generate unique ID and save file
-        track_id = str(uuid.uuid4())
-        ext = Path(file.filename).suffix or ".audio"
-        filepath = FILES_DIR / f"{track_id}{ext}"
+        track_id, filepath = _new_upload_path(file.filename)
         file.save(filepath)
 
-        # Get duration
-        duration = get_duration(filepath)
-        if duration is None:
-            filepath.unlink()  # Remove invalid file
-            continue
+        track = _register_upload(track_id, filepath, file.filename)
+        if track:
+            new_tracks.append(track)
 
-        track = {
-            "id": track_id,
-            "name": file.filename,
-            "duration": duration,
-            "filepath": str(filepath),
-            "source_url": None,
-        }
-        tracks.append(track)
-        new_tracks.append({
-            "id": track_id,
-            "name": file.filename,
-            "duration": duration,
-        })
+    return jsonify({"tracks": new_tracks})
 
-    if new_tracks:
-        save_playlist()
 
-    return jsonify({"tracks": new_tracks})
+@app.route("/upload-stream", methods=["POST"])
+def upload_stream():
+    """Handle a single raw-body file upload (?filename=...).
+
+    The body is streamed straight to disk, so memory use doesn't grow with
+    file size. Returns list of track info like /upload.
+    """
+    filename = request.args.get("filename", "").strip()
+    if not filename:
+        return jsonify({"error": "Missing filename"}), 400
+
+    track_id, filepath = _new_upload_path(filename)
+    try:
+        with open(filepath, "wb") as f:
+            while chunk := request.stream.read(UPLOAD_CHUNK_SIZE):
+                f.write(chunk)
+    except Exception:
+        # Client went away mid-body (or the disk filled up): drop the partial file
+        filepath.unlink(missing_ok=True)
+        raise
+
+    track = _register_upload(track_id, filepath, filename)
+    if track is None:
+        return jsonify({"tracks": []})
+
+    return jsonify({"tracks": [track]})
 
 
 @app.route("/tracks", methods=["GET"])
@@ -177,49 +321,51 @@ def get_tracks():
 @app.route("/track/<track_id>", methods=["DELETE"])
 def delete_track(track_id):
     """Remove a track from the queue."""
-    global tracks
-    for i, track in enumerate(tracks):
-        if track["id"] == track_id:
-            # Remove file
-            filepath = Path(track["filepath"])
-            if filepath.exists():
-                filepath.unlink()
-            # Remove from list
-            tracks.pop(i)
-            save_playlist()
-            return jsonify({"success": True})
-
-    return jsonify({"error": "Track not found"}), 404
+    with _tracks_lock:
+        track = tracks_by_id.pop(track_id, None)
+        if track is None:
+            return jsonify({"error": "Track not found"}), 404
+
+        # Remove from list
+        tracks.remove(track)
+        _db_delete([track_id])
+
+    # Remove file
+    filepath = Path(track["filepath"])
+    if filepath.exists():
+        filepath.unlink()
+    return jsonify({"success": True})
 
 
 @app.route("/reorder", methods=["POST"])
 def reorder():
     """Update track order."""
-    global tracks
     data = request.get_json()
     if not data or "order" not in data:
         return jsonify({"error": "Missing order"}), 400
 
     new_order = data["order"]  # List of track IDs in new order
 
-    # Build new track list maintaining order
-    track_map = {t["id"]: t for t in tracks}
-    new_tracks = []
-    for track_id in new_order:
-        if track_id in track_map:
-            new_tracks.append(track_map[track_id])
-
-    tracks = new_tracks
-    save_playlist()
+    # Permute in place; tracks left out of the new order are dropped
+    order_pos = {tid: i for i, tid in enumerate(new_order)}
+    with _tracks_lock:
+        dropped = [t["id"] for t in tracks if t["id"] not in order_pos]
+        if dropped:
+            tracks[:] = [t for t in tracks if t["id"] in order_pos]
+            for tid in dropped:
+                del tracks_by_id[tid]
+            _db_delete(dropped)
+        tracks.sort(key=lambda t: order_pos[t["id"]])
+        save_order()
     return jsonify({"success": True})
 
 
 @app.route("/randomize", methods=["POST"])
 def randomize():
     """Shuffle track order."""
-    global tracks
-    random.shuffle(tracks)
-    save_playlist()
+    with _tracks_lock:
+        random.shuffle(tracks)
+        save_order()
     return jsonify({
         "tracks": [
             {"id": t["id"], "name": t["name"], "duration": t["duration"]}
@@ -231,13 +377,15 @@ def randomize():
 @app.route("/clear", methods=["POST"])
 def clear_all():
     """Remove all tracks and their files."""
-    global tracks
-    for track in tracks:
+    with _tracks_lock:
+        removed = tracks
+        _db_delete([t["id"] for t in removed])
+        _set_tracks([])
+
+    for track in removed:
         filepath = Path(track["filepath"])
         if filepath.exists():
             filepath.unlink()
-    tracks = []
-    save_playlist()
     return jsonify({"success": True})
 
 
@@ -246,19 +394,19 @@ def serve_audio(track_id):
     """Serve audio file for playback or download."""
     download = request.args.get("download", "false").lower() == "true"
 
-    for track in tracks:
-        if track["id"] == track_id:
-            filepath = Path(track["filepath"])
-            if filepath.exists():
-                if download:
-                    # Build download name from track name + original extension
-                    ext = filepath.suffix
-                    download_name = track["name"]
-                    if not download_name.lower().endswith(ext.lower()):
-                        download_name += ext
-                    return send_file(filepath, as_attachment=True, download_name=download_name)
-                return send_file(filepath)
-            break
+    track = tracks_by_id.get(track_id)
+    if track is not None:
+        filepath = Path(track["filepath"])
+        if filepath.exists():
+            if download:
+                # Build download name from track name + original extension
+                ext = filepath.suffix
+                download_name = track["name"]
+                if not download_name.lower().endswith(ext.lower()):
+                    download_name += ext
+                return send_file(filepath, as_attachment=True, download_name=download_name)
+            # Under gunicorn the body goes out via wsgi.file_wrapper/sendfile
+            return send_file(filepath)
     return jsonify({"error": "Track not found"}), 404
 
 
@@ -272,6 +420,43 @@ def cd_info():
     })
 
 
+def _materialize(src: Path, dst: Path) -> None:
+    """Place a cached file into FILES_DIR.
+
+    Hardlinks when possible (same filesystem) so no bytes are copied; the
+    link survives cache cleanup of the original. Falls back to copying.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _register_download(result: DownloadResult) -> None:
+    """Add a finished download to the playlist.
+
+    Raises:
+        OSError, sqlite3.Error: If the file can't be placed or recorded
+    """
+    # Link (or copy) file from cache to files dir
+    track_id = str(uuid.uuid4())
+    ext = result.filepath.suffix
+    dest_path = FILES_DIR / f"{track_id}{ext}"
+    try:
+        _materialize(result.filepath, dest_path)
+        _add_track({
+            "id": track_id,
+            "name": result.title,
+            "duration": result.duration,
+            "filepath": str(dest_path),
+            "source_url": result.source_url,
+        })
+    except (OSError, sqlite3.Error):
+        app.logger.exception("Failed to add downloaded file %s", result.filepath)
+        dest_path.unlink(missing_ok=True)
+        raise
+
+
 @app.route("/download", methods=["POST"])
 def download():
     """Start downloading URLs. Returns job IDs."""
@@ -287,23 +472,10 @@ def download():
 
     def on_complete(job: DownloadJob):
         """Called when a download job completes."""
-        if job.status == JobStatus.COMPLETE and job.result:
-            # Copy file from cache to files dir
-            result = job.result
-            track_id = str(uuid.uuid4())
-            ext = result.filepath.suffix
-            dest_path = FILES_DIR / f"{track_id}{ext}"
-            shutil.copy2(result.filepath, dest_path)
-
-            track = {
-                "id": track_id,
-                "name": result.title,
-                "duration": result.duration,
-                "filepath": str(dest_path),
-                "source_url": result.source_url,
-            }
-            tracks.append(track)
-            save_playlist()
+        # Runs before the job is reported complete, so the client's
+        # follow-up track list already includes the new track
+        if job.result:
+            _register_download(job.result)
 
     for url in urls:
         job_id = start_download(url, CACHE_DIR, on_complete=on_complete)
@@ -323,19 +495,28 @@ def download_progress():
 
     def generate():
         pending = set(ids)
+        last_state = {}  # job_id -> (status, progress, message) last sent
+        version = job_update_version()
 
         while pending:
-            for job_id in list(pending):
+            finished = []  # Removed after the pass, so pending needn't be copied
+            for job_id in pending:
                 job = get_job(job_id)
                 if job is None:
                     # Job not found, remove from pending
-                    pending.discard(job_id)
+                    finished.append(job_id)
                     yield sse_event({
                         "id": job_id,
                         "status": "not_found",
                     }, "update")
                     continue
 
+                # Only send frames for jobs that actually changed
+                state = (job.status, job.progress, job.message)
+                if last_state.get(job_id) == state:
+                    continue
+                last_state[job_id] = state
+
                 yield sse_event({
                     "id": job.id,
                     "url": job.url,
@@ -350,11 +531,13 @@ def download_progress():
                 }, "update")
 
                 if job.status in (JobStatus.COMPLETE, JobStatus.FAILED):
-                    pending.discard(job_id)
+                    finished.append(job_id)
                     cleanup_job(job_id)
 
+            pending.difference_update(finished)
+
             if pending:
-                time.sleep(0.5)
+                version = wait_for_job_update(version, timeout=5)
 
         yield sse_event({"done": True}, "complete")
 
@@ -382,73 +565,266 @@ def job_status(job_id):
     })
 
 
-@app.route("/burn", methods=["GET"])
-def burn():
-    """Burn CD with SSE progress updates."""
-    dummy = request.args.get("dummy", "false").lower() == "true"
-    gaps = request.args.get("gaps", "true").lower() == "true"
-
-    def generate():
-        if not tracks:
-            yield sse_event({"success": False, "message": "No tracks to burn"}, "complete")
+def _burn_events(wav_files: list[Path], **burn_kwargs):
+    """Run burn_cd and translate its updates into SSE events."""
+    for update in burn_cd(wav_files, **burn_kwargs):
+        if update[0] == "progress":
+            _, track, percent, message = update
+            yield sse_event({
+                "track": track,
+                "percent": percent,
+                "status": "burning",
+                "message": message,
+            }, "progress")
+        elif update[0] == "result":
+            _, success, message = update
+            yield sse_event({
+                "success": success,
+                "message": message,
+            }, "complete")
+
+
+def _streamed_burn(
+    burn_tracks: list[dict], scratch: Path, dummy: bool, gaps: bool, normalize: bool
+):
+    """Burn by piping ffmpeg output straight into wodim through FIFOs.
+
+    Each track gets a named pipe that its ffmpeg process writes raw PCM into
+    while wodim reads it, so conversion overlaps burning and no WAV files
+    are written. Yields SSE events.
+    """
+    total = len(burn_tracks)
+    pipes = [scratch / f"track_{i + 1:02d}.cdr" for i in range(total)]
+    encoders = []
+
+    yield sse_event({
+        "track": 1,
+        "percent": 0,
+        "status": "converting",
+        "message": f"Measuring {total} track(s)...",
+    }, "progress")
+
+    # wodim needs each track's exact size up front, and the stored playlist
+    # duration may be a metadata estimate, so measure the real length
+    with ThreadPoolExecutor(max_workers=min(total, os.cpu_count() or 1)) as executor:
+        durations = list(executor.map(
+            lambda t: get_exact_duration(Path(t["filepath"])), burn_tracks
+        ))
+    for i, duration in enumerate(durations):
+        if duration is None:
+            yield sse_event({
+                "success": False,
+                "message": f"Failed to read track {i + 1}: {burn_tracks[i]['name']}",
+            }, "complete")
             return
+    sizes = [cd_pcm_size(d) for d in durations]
 
-        wav_files = []
+    yield sse_event({
+        "track": 1,
+        "percent": 0,
+        "status": "burning",
+        "message": f"Streaming {total} track(s) to disc...",
+    }, "progress")
 
-        # Convert all tracks to CD-compatible WAV
-        for i, track in enumerate(tracks):
-            track_num = i + 1
-            yield sse_event({
-                "track": track_num,
-                "percent": 0,
-                "status": "converting",
-                "message": f"Converting track {track_num} of {len(tracks)}: {track['name']}",
-            }, "progress")
+    try:
+        for track, pipe, duration in zip(burn_tracks, pipes, durations):
+            pipe.unlink(missing_ok=True)
+            os.mkfifo(pipe)
+            encoders.append(
+                start_cd_pcm_stream(Path(track["filepath"]), pipe, duration, normalize=normalize)
+            )
+
+        yield from _burn_events(pipes, dummy=dummy, gaps=gaps, track_sizes=sizes)
+    except OSError as e:
+        yield sse_event({"success": False, "message": f"Failed to start streaming: {e}"}, "complete")
+    finally:
+        # Encoders are blocked on their pipe if wodim bailed out early
+        for encoder in encoders:
+            encoder.kill()
+            encoder.wait()
+        for pipe in pipes:
+            pipe.unlink(missing_ok=True)
+
+
+@dataclass
+class BurnJob:
+    """Tracks a burn running in the background.
+
+    Events are appended to a log rather than consumed from a queue, so every
+    reader sees the whole stream and late or reconnecting readers replay it.
+    """
+    id: str
+    events: list[bytes] = field(default_factory=list)
+    status: str = "running"
+    changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    def publish(self, event: bytes) -> None:
+        """Append an event and wake up readers."""
+        with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    def finish(self) -> None:
+        """Mark the job complete and wake up readers."""
+        with self.changed:
+            self.status = "complete"
+            self.changed.notify_all()
+
+    def wait_for_events(self, start: int, timeout: float | None = None) -> tuple[list[bytes], bool]:
+        """Block until there are events past index start, or the job is done.
+
+        Returns:
+            (new events, whether the job has finished)
+        """
+        with self.changed:
+            self.changed.wait_for(
+                lambda: len(self.events) > start or self.status != "running", timeout
+            )
+            return self.events[start:], self.status != "running"
+
+
+# Only one burn can run at a time (there is one drive)
+_burn_job: BurnJob | None = None
+_burn_lock = threading.Lock()
+
+
+def _run_burn(dummy: bool, gaps: bool, stream: bool, normalize: bool):
+    """Convert and burn the current playlist, yielding SSE events."""
+    if not tracks:
+        yield sse_event({"success": False, "message": "No tracks to burn"}, "complete")
+        return
 
-            input_path = Path(track["filepath"])
-            output_path = wav_dir / f"track_{track_num:02d}.wav"
+    burn_tracks = list(tracks)
 
-            success = convert_to_cd_wav(input_path, output_path)
-            if not success:
+    # Scratch space is chosen per burn, so a tmpfs that has filled up since
+    # startup isn't used (streamed burns only need room for the FIFOs)
+    needed = 0 if stream else sum(cd_pcm_size(t["duration"]) for t in burn_tracks)
+    scratch = Path(tempfile.mkdtemp(prefix="cd-burner-wav-", dir=_scratch_parent(needed)))
+    try:
+        if stream:
+            burn_events = _streamed_burn(burn_tracks, scratch, dummy, gaps, normalize)
+        else:
+            burn_events = _converted_burn(burn_tracks, scratch, dummy, gaps, normalize)
+        yield from burn_events
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _converted_burn(
+    burn_tracks: list[dict], scratch: Path, dummy: bool, gaps: bool, normalize: bool
+):
+    """Convert tracks to WAV files in scratch, then burn them. Yields SSE events."""
+    total = len(burn_tracks)
+    wav_files = [scratch / f"track_{i + 1:02d}.wav" for i in range(total)]
+
+    yield sse_event({
+        "track": 1,
+        "percent": 0,
+        "status": "converting",
+        "message": f"Converting {total} track(s)...",
+    }, "progress")
+
+    # Convert all tracks to CD-compatible WAV in parallel (each is an
+    # independent ffmpeg process); output paths are fixed per index so
+    # track order is preserved regardless of completion order.
+    executor = ThreadPoolExecutor(max_workers=min(total, os.cpu_count() or 1))
+    try:
+        futures = {
+            executor.submit(convert_to_cd_wav, Path(track["filepath"]), wav_files[i], normalize): i
+            for i, track in enumerate(burn_tracks)
+        }
+
+        done = 0
+        for future in as_completed(futures):
+            i = futures[future]
+            track_num = i + 1
+            if not future.result():
+                # Report the failure now; in-flight conversions are waited
+                # for (and their WAVs removed with the scratch dir) afterwards
+                executor.shutdown(wait=False, cancel_futures=True)
                 yield sse_event({
                     "success": False,
-                    "message": f"Failed to convert track {track_num}: {track['name']}",
+                    "message": f"Failed to convert track {track_num}: {burn_tracks[i]['name']}",
                 }, "complete")
                 return
 
-            wav_files.append(output_path)
+            done += 1
 
             yield sse_event({
                 "track": track_num,
-                "percent": 100,
+                "percent": int(done * 100 / total),
                 "status": "converting",
-                "message": f"Converted track {track_num} of {len(tracks)}",
+                "message": f"Converted {done} of {total} tracks",
             }, "progress")
+    finally:
+        executor.shutdown(wait=True)
+
+    # Burn to disc - iterate over generator for real-time progress
+    yield from _burn_events(wav_files, dummy=dummy, gaps=gaps)
 
-        # Burn to disc - iterate over generator for real-time progress
-        for update in burn_cd(wav_files, dummy=dummy, gaps=gaps):
-            if update[0] == "progress":
-                _, track, percent, message = update
-                yield sse_event({
-                    "track": track,
-                    "percent": percent,
-                    "status": "burning",
-                    "message": message,
-                }, "progress")
-            elif update[0] == "result":
-                _, success, message = update
-                yield sse_event({
-                    "success": success,
-                    "message": message,
-                }, "complete")
 
-        # Clean up WAV files
-        for wav_file in wav_files:
-            if wav_file.exists():
-                wav_file.unlink()
+def _burn_worker(job: BurnJob, dummy: bool, gaps: bool, stream: bool, normalize: bool) -> None:
+    """Run a burn, appending its events to the job's log."""
+    try:
+        for event in _run_burn(dummy, gaps, stream, normalize):
+            job.publish(event)
+    except Exception as e:
+        job.publish(sse_event({"success": False, "message": f"Burn failed: {e}"}, "complete"))
+    finally:
+        job.finish()
+
+
+@app.route("/burn", methods=["POST"])
+def burn():
+    """Start burning the CD in the background. Returns the burn job ID."""
+    global _burn_job
+    dummy = request.args.get("dummy", "false").lower() == "true"
+    gaps = request.args.get("gaps", "true").lower() == "true"
+    stream = request.args.get("stream", "false").lower() == "true"
+    normalize = request.args.get("normalize", "true").lower() == "true"
+
+    with _burn_lock:
+        if _burn_job is not None and _burn_job.status == "running":
+            return jsonify({"error": "Burn already in progress", "id": _burn_job.id}), 409
+
+        job = BurnJob(id=str(uuid.uuid4()))
+        _burn_job = job
+
+    threading.Thread(
+        target=_burn_worker, args=(job, dummy, gaps, stream, normalize), daemon=True
+    ).start()
+    return jsonify({"id": job.id})
+
+
+@app.route("/burn-progress/<job_id>")
+def burn_progress(job_id):
+    """SSE stream of progress for a burn job.
+
+    Each reader replays the job's events from the start, so reconnecting
+    (or opening a second tab) still sees the full stream, including the
+    final result.
+    """
+    job = _burn_job
+    if job is None or job.id != job_id:
+        return jsonify({"error": "Burn job not found"}), 404
+
+    def generate():
+        sent = 0
+        while True:
+            events, finished = job.wait_for_events(sent, timeout=15)
+            if not events and not finished:
+                yield b": keepalive\n\n"
+                continue
+            for event in events:
+                yield event
+            sent += len(events)
+            if finished:
+                return
 
     return Response(generate(), mimetype="text/event-stream")
 
 
 if __name__ == "__main__":
+    # Development server only: it streams files through Python. Production
+    # runs under gunicorn (see supervisord.conf) for zero-copy file serving.
     app.run(host="0.0.0.0", port=3379, debug=True, use_reloader=False)
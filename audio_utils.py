@@ -1,10 +1,14 @@
-"""Audio processing utilities using ffmpeg/ffprobe."""
+"""Audio processing utilities using ffmpeg/ffprobe and mutagen."""
 
+import functools
 import json
-import re
+import os
+import shutil
 import subprocess
 from pathlib import Path
 
+import mutagen
+
 # Normalization targets (EBU R128)
 TARGET_LUFS = -14.0  # Integrated loudness target (typical for music)
 TARGET_TP = -1.0     # True peak limit (prevents intersample clipping)
@@ -12,7 +16,11 @@ TARGET_LRA = 11.0    # Loudness range
 
 
 def get_duration(filepath: Path) -> float | None:
-    """Get audio duration in seconds using ffprobe.
+    """Get audio duration in seconds.
+
+    Reads container headers in-process with mutagen, falling back to
+    ffprobe for formats mutagen can't handle. Results are cached per
+    (path, size, mtime), so repeated lookups of an unchanged file are free.
 
     Args:
         filepath: Path to audio file
@@ -20,6 +28,23 @@ def get_duration(filepath: Path) -> float | None:
     Returns:
         Duration in seconds, or None if unable to determine
     """
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return _probe_duration(os.fspath(filepath), st.st_size, st.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=512)
+def _probe_duration(path: str, size: int, mtime_ns: int) -> float | None:
+    """Probe a file's duration (size/mtime only key the cache)."""
+    try:
+        audio = mutagen.File(path)
+        if audio is not None and audio.info.length > 0:
+            return float(audio.info.length)
+    except (mutagen.MutagenError, OSError, ValueError):
+        pass
+
     try:
         result = subprocess.run(
             [
@@ -27,7 +52,7 @@ def get_duration(filepath: Path) -> float | None:
                 "-v", "quiet",
                 "-print_format", "json",
                 "-show_format",
-                str(filepath),
+                path,
             ],
             capture_output=True,
             text=True,
@@ -45,48 +70,192 @@ def get_duration(filepath: Path) -> float | None:
         return None
 
 
-def _analyze_loudness(input_path: Path) -> dict | None:
-    """Analyze audio loudness using ffmpeg loudnorm filter (pass 1).
+def get_exact_duration(filepath: Path) -> float | None:
+    """Get audio duration from the stream's packet timestamps.
+
+    Unlike get_duration, this never trusts header or bitrate estimates: it
+    reads every packet of the first audio stream (demux only, no decode), so
+    it is exact even for VBR MP3s without a Xing header. Slower, so only
+    used where the length must match the decoded audio.
 
     Args:
-        input_path: Source audio file
+        filepath: Path to audio file
 
     Returns:
-        Dict with measured values, or None on failure
+        Duration in seconds, or None if unable to determine
     """
-    af_filter = f"loudnorm=I={TARGET_LUFS}:TP={TARGET_TP}:LRA={TARGET_LRA}:print_format=json"
-
     try:
         result = subprocess.run(
             [
-                "ffmpeg",
-                "-i", str(input_path),
-                "-af", af_filter,
-                "-f", "null",
-                "-",
+                "ffprobe",
+                "-v", "quiet",
+                "-select_streams", "a:0",
+                "-show_entries", "packet=pts_time,duration_time",
+                "-of", "csv=p=0",
+                str(filepath),
             ],
             capture_output=True,
             text=True,
-            timeout=300,
+            timeout=60,
+        )
+        if result.returncode != 0:
+            return None
+
+        first_pts = None
+        end = None
+        for line in result.stdout.splitlines():
+            pts, _, dur = line.partition(",")
+            try:
+                pts = float(pts)
+                dur = float(dur.rstrip(","))
+            except ValueError:
+                continue  # N/A timestamps
+            if first_pts is None:
+                first_pts = pts
+            end = max(end or 0.0, pts + dur)
+        if first_pts is None:
+            return None
+        return end - first_pts
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+
+
+@functools.cache
+def _has_soxr() -> bool:
+    """Check (once) whether the installed ffmpeg was built with libsoxr."""
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-version"],
+            capture_output=True,
+            text=True,
+            timeout=10,
         )
+        return "--enable-libsoxr" in result.stdout
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return False
+
 
-        # loudnorm outputs JSON to stderr after processing
-        # Find the JSON block in stderr
-        stderr = result.stderr
-        json_match = re.search(r'\{[^{}]*"input_i"[^{}]*\}', stderr, re.DOTALL)
-        if not json_match:
+def _probe_streams(input_path: Path) -> dict | None:
+    """Get format and first audio stream info using ffprobe.
+
+    Args:
+        input_path: Audio file to probe
+
+    Returns:
+        Dict with "format" and "stream" entries, or None on failure
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v", "quiet",
+                "-print_format", "json",
+                "-select_streams", "a:0",
+                "-show_streams",
+                "-show_format",
+                str(input_path),
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        if result.returncode != 0:
             return None
 
-        return json.loads(json_match.group())
-    except (subprocess.TimeoutExpired, FileNotFoundError, json.JSONDecodeError):
+        data = json.loads(result.stdout)
+        streams = data.get("streams") or [{}]
+        return {"format": data.get("format", {}), "stream": streams[0]}
+    except (subprocess.TimeoutExpired, json.JSONDecodeError, FileNotFoundError):
         return None
 
 
+def _is_cd_wav(input_path: Path) -> bool:
+    """Check whether a file is already a 44.1kHz/16-bit/stereo PCM WAV."""
+    info = _probe_streams(input_path)
+    if info is None:
+        return False
+    stream = info["stream"]
+    return (
+        info["format"].get("format_name") == "wav"
+        and stream.get("codec_name") == "pcm_s16le"
+        and stream.get("sample_rate") == "44100"
+        and stream.get("channels") == 2
+        and stream.get("sample_fmt") == "s16"
+    )
+
+
+def _cd_filters(normalize: bool) -> list[str]:
+    """Build the ffmpeg audio filter chain for CD conversion."""
+    filters = []
+    if normalize:
+        # Single-pass dynamic loudnorm: no separate analysis decode
+        filters.append(f"loudnorm=I={TARGET_LUFS}:TP={TARGET_TP}:LRA={TARGET_LRA}")
+    if _has_soxr():
+        # SoX resampler is SIMD-accelerated and faster than swresample
+        filters.append("aresample=44100:resampler=soxr:precision=28")
+    else:
+        filters.append("aresample=44100")
+    return filters
+
+
+def cd_pcm_size(duration: float) -> int:
+    """Byte size of a track streamed by start_cd_pcm_stream."""
+    return round(duration * 44100) * 4
+
+
+def start_cd_pcm_stream(
+    input_path: Path,
+    output_path: Path,
+    duration: float,
+    normalize: bool = True,
+) -> subprocess.Popen:
+    """Start ffmpeg writing CD audio as raw big-endian PCM (wodim's raw format).
+
+    Intended for writing into a named pipe that wodim reads from, so no WAV
+    intermediate hits the disk. The output is padded/trimmed to exactly
+    cd_pcm_size(duration) bytes, which must be passed to wodim as tsize=.
+    Pass the decoded length (get_exact_duration), not a metadata estimate,
+    or the end of the track is cut off or padded with silence.
+
+    Args:
+        input_path: Source audio file (any ffmpeg-supported format)
+        output_path: Destination (typically a FIFO)
+        duration: Track duration in seconds, used to fix the output length
+        normalize: If True, apply loudness normalization (default True)
+
+    Returns:
+        The running ffmpeg process (caller must wait/terminate it)
+    """
+    samples = cd_pcm_size(duration) // 4
+    filters = _cd_filters(normalize)
+    filters += [f"apad=whole_len={samples}", f"atrim=end_sample={samples}"]
+
+    return subprocess.Popen(
+        [
+            "ffmpeg",
+            "-y",
+            "-v", "error",
+            "-threads", "0",
+            "-filter_threads", str(os.cpu_count() or 1),
+            "-i", str(input_path),
+            "-af", ",".join(filters),
+            "-ac", "2",
+            "-f", "s16be",
+            str(output_path),
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
 def convert_to_cd_wav(input_path: Path, output_path: Path, normalize: bool = True) -> bool:
     """Convert audio file to CD-compatible WAV format with normalization.
 
     CD audio requires: 44100Hz, 16-bit, stereo PCM.
-    Uses two-pass EBU R128 loudness normalization for consistent volume.
+    Uses single-pass (dynamic) EBU R128 loudness normalization for consistent volume.
+    Without normalization, inputs that are already CD-format WAV are
+    hardlinked (or copied) instead of being re-encoded.
 
     Args:
         input_path: Source audio file (any ffmpeg-supported format)
@@ -96,33 +265,27 @@ def convert_to_cd_wav(input_path: Path, output_path: Path, normalize: bool = Tru
     Returns:
         True if conversion successful, False otherwise
     """
-    try:
-        if normalize:
-            # Pass 1: Analyze loudness
-            measurements = _analyze_loudness(input_path)
-            if measurements is None:
-                # Fall back to no normalization if analysis fails
-                normalize = False
-
-        if normalize:
-            # Pass 2: Normalize with measured values
-            af_filter = (
-                f"loudnorm=I={TARGET_LUFS}:TP={TARGET_TP}:LRA={TARGET_LRA}"
-                f":measured_I={measurements['input_i']}"
-                f":measured_TP={measurements['input_tp']}"
-                f":measured_LRA={measurements['input_lra']}"
-                f":measured_thresh={measurements['input_thresh']}"
-                f":offset={measurements['target_offset']}"
-                f":linear=true"
-            )
-            af_args = ["-af", af_filter]
-        else:
-            af_args = []
+    if not normalize and _is_cd_wav(input_path):
+        try:
+            output_path.unlink(missing_ok=True)
+            try:
+                os.link(input_path, output_path)
+            except OSError:
+                # Different filesystem (or no hardlink support)
+                shutil.copyfile(input_path, output_path)
+            return True
+        except OSError:
+            pass  # Fall through to a normal conversion
 
+    af_args = ["-af", ",".join(_cd_filters(normalize))]
+
+    try:
         result = subprocess.run(
             [
                 "ffmpeg",
                 "-y",  # Overwrite output
+                "-threads", "0",  # Let ffmpeg pick decoder threads
+                "-filter_threads", str(os.cpu_count() or 1),
                 "-i", str(input_path),
                 *af_args,
                 "-ar", "44100",      # Sample rate
@@ -131,8 +294,10 @@ def convert_to_cd_wav(input_path: Path, output_path: Path, normalize: bool = Tru
                 "-f", "wav",
                 str(output_path),
             ],
-            capture_output=True,
-            text=True,
+            # Only the exit code matters; don't buffer and decode ffmpeg's log
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
             timeout=300,  # 5 minutes max for large files
         )
         return result.returncode == 0
@@ -1,12 +1,68 @@
 """CD detection and burning utilities using wodim."""
 
+import fcntl
+import os
 import re
 import subprocess
+import time
+from collections import deque
 from pathlib import Path
 
 # Default CD capacity in seconds (80 minute disc)
 DEFAULT_CAPACITY_SECONDS = 80 * 60
 
+# Lines of wodim output kept for the failure message
+OUTPUT_TAIL_LINES = 200
+
+# Linux ioctl request to eject the tray (linux/cdrom.h)
+CDROMEJECT = 0x5309
+
+# wodim -atip lead-out line: "ATIP start of lead out: 359849 (79:57/74)"
+_ATIP_RE = re.compile(r"ATIP start of lead out.*?\((\d+):(\d+)/\d+\)")
+
+# wodim progress line: "Track 01:    5 of   45 MB written (fifo 100%) [buf  99%]   4.0x."
+# Bytes patterns: burn output is matched undecoded
+_TRACK_RE = re.compile(rb"Track\s+(\d+):\s+(\d+)\s+of\s+(\d+)\s+MB")
+_FIXATING = b"Fixating"
+
+# How long a successful ATIP reading is reused before asking the drive again
+ATIP_CACHE_TTL_SECONDS = 60.0
+
+# device -> (monotonic time read, capacity seconds)
+_atip_cache: dict[str, tuple[float, int]] = {}
+
+
+def invalidate_cd_capacity(device: str = "/dev/sr0") -> None:
+    """Forget the cached capacity for a device (e.g. after ejecting).
+
+    Args:
+        device: CD device path
+    """
+    _atip_cache.pop(device, None)
+
+
+def eject(device: str = "/dev/sr0") -> bool:
+    """Eject the disc with a CDROMEJECT ioctl (no eject process needed).
+
+    Failure is not critical to callers, so errors are swallowed.
+
+    Args:
+        device: CD device path
+
+    Returns:
+        True if the eject request succeeded
+    """
+    invalidate_cd_capacity(device)
+    try:
+        fd = os.open(device, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            fcntl.ioctl(fd, CDROMEJECT)
+        finally:
+            os.close(fd)
+        return True
+    except OSError:
+        return False
+
 
 def get_cd_capacity(device: str = "/dev/sr0") -> int | None:
     """Get CD capacity in seconds by reading ATIP info.
@@ -14,12 +70,20 @@ def get_cd_capacity(device: str = "/dev/sr0") -> int | None:
     If a non-writable disc is detected (already burned/finalized),
     it will be ejected automatically.
 
+    Successful readings are cached for ATIP_CACHE_TTL_SECONDS, since each
+    wodim -atip call takes seconds and spins up the drive. "No disc" results
+    aren't cached, so a newly inserted disc is picked up right away.
+
     Args:
         device: CD device path
 
     Returns:
         Capacity in seconds, or None if no disc/device/not writable
     """
+    cached = _atip_cache.get(device)
+    if cached and time.monotonic() - cached[0] < ATIP_CACHE_TTL_SECONDS:
+        return cached[1]
+
     try:
         result = subprocess.run(
             ["wodim", f"dev={device}", "-atip"],
@@ -35,43 +99,61 @@ def get_cd_capacity(device: str = "/dev/sr0") -> int | None:
         # "Disc status: complete" means finalized/not writable
         if "Disc status: complete" in output:
             # Eject non-writable disc
-            try:
-                subprocess.run(["eject", device], timeout=30)
-            except Exception:
-                pass
+            eject(device)
             return None
 
         # Parse output for lead-out time (indicates disc capacity)
         # Format: "ATIP start of lead out: 359849 (79:57/74)"
         # The time in parentheses is MM:SS/frames
-        for line in output.split("\n"):
-            if "ATIP start of lead out" in line:
-                match = re.search(r"\((\d+):(\d+)/\d+\)", line)
-                if match:
-                    minutes = int(match.group(1))
-                    seconds = int(match.group(2))
-                    return minutes * 60 + seconds
+        # One scan per buffer; the pattern's literal prefix anchors it to the line
+        match = _ATIP_RE.search(result.stdout) or _ATIP_RE.search(result.stderr)
+        if match:
+            minutes = int(match.group(1))
+            seconds = int(match.group(2))
+            capacity = minutes * 60 + seconds
+            _atip_cache[device] = (time.monotonic(), capacity)
+            return capacity
 
         return None
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return None
 
 
+def _iter_output_lines(stream, chunk_size: int = 256):
+    """Yield lines from a binary stream, splitting on \\r as well as \\n.
+
+    wodim redraws its progress line with bare carriage returns, which a
+    line-buffered reader would hold back until the next newline.
+    """
+    pending = b""
+    while chunk := stream.read(chunk_size):
+        lines = (pending + chunk).replace(b"\r", b"\n").split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line:
+                yield line
+    if pending:
+        yield pending
+
+
 def burn_cd(
     wav_files: list[Path],
     device: str = "/dev/sr0",
     dummy: bool = False,
     gaps: bool = True,
+    track_sizes: list[int] | None = None,
 ):
     """Burn WAV files to audio CD.
 
     Generator that yields progress updates and final result.
 
     Args:
-        wav_files: List of WAV file paths in track order
+        wav_files: List of WAV file paths in track order. With track_sizes,
+            these may instead be named pipes carrying raw big-endian PCM.
         device: CD device path
         dummy: If True, perform dry run without actually burning
         gaps: If True, use 2-second gaps between tracks (default). If False, no gaps.
+        track_sizes: Byte size of each track, required when tracks are pipes
 
     Yields:
         ("progress", track_num, percent, message) for progress updates
@@ -99,27 +181,30 @@ def burn_cd(
         if not gaps and i > 0:
             # No pregap for tracks after the first (track 1 always has standard lead-in)
             cmd.append("pregap=0")
-        cmd.append(str(wav_file))
+        if track_sizes:
+            # Pipes can't be sized by seeking, so wodim needs them up front
+            cmd.append(f"tsize={track_sizes[i]}")
+        cmd.append(os.fspath(wav_file))
 
     try:
         process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,  # Line buffered
+            bufsize=0,  # Unbuffered: progress arrives as it's written
         )
 
         current_track = 0
         total_tracks = len(wav_files)
-        output_lines = []  # Capture output for error reporting
+        # Recent raw output for error reporting (only the tail is ever used)
+        output_lines = deque(maxlen=OUTPUT_TAIL_LINES)
 
-        for line in iter(process.stdout.readline, ""):
+        for line in _iter_output_lines(process.stdout):
             line = line.strip()
             output_lines.append(line)
 
             # Track progress: "Track 01:    5 of   45 MB written (fifo 100%) [buf  99%]   4.0x."
-            track_match = re.search(r"Track\s+(\d+):\s+(\d+)\s+of\s+(\d+)\s+MB", line)
+            track_match = _TRACK_RE.search(line)
             if track_match:
                 track_num = int(track_match.group(1))
                 written_mb = int(track_match.group(2))
@@ -134,7 +219,7 @@ def burn_cd(
                     yield ("progress", current_track, percent, f"Burning track {current_track} of {total_tracks}")
 
             # Fixating: "Fixating..."
-            if "Fixating" in line:
+            if _FIXATING in line:
                 yield ("progress", total_tracks, 100, "Fixating disc...")
 
         process.wait()
@@ -142,15 +227,15 @@ def burn_cd(
         if process.returncode == 0:
             # Eject disc after successful burn (not in dummy mode)
             if not dummy:
-                try:
-                    subprocess.run(["eject", device], timeout=30)
-                except Exception:
-                    pass  # Eject failure is not critical
+                eject(device)
             yield ("result", True, "Burn completed successfully")
         else:
             # Find error lines (wodim prefixes errors with "wodim:")
-            error_lines = [l for l in output_lines if l.startswith("wodim:") or "Cannot" in l or "error" in l.lower()]
-            error_detail = "; ".join(error_lines[-3:]) if error_lines else "unknown error"
+            error_lines = [l for l in output_lines if l.startswith(b"wodim:") or b"Cannot" in l or b"error" in l.lower()]
+            error_detail = (
+                "; ".join(l.decode("ascii", "replace") for l in error_lines[-3:])
+                if error_lines else "unknown error"
+            )
             yield ("result", False, f"Burn failed (exit {process.returncode}): {error_detail}")
 
     except FileNotFoundError:
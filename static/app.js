@@ -18,6 +18,7 @@
     const burnBtn = document.getElementById('burn-btn');
     const trackGaps = document.getElementById('track-gaps');
     const dummyMode = document.getElementById('dummy-mode');
+    const normalize = document.getElementById('normalize');
     const statusDiv = document.getElementById('status');
     const progressContainer = document.getElementById('progress-container');
     const progressText = document.getElementById('progress-text');
@@ -283,41 +284,55 @@
             return;
         }
 
-        const formData = new FormData();
-        for (const file of files) {
-            formData.append('files', file);
-        }
-
         showStatus('Uploading and analyzing files...');
 
+        // Stream one file per request so the server writes straight to disk.
+        // Each successful request has already added its track on the server,
+        // so whatever was added is shown even if a later file fails.
+        const added = [];
+        let failure = null;
         try {
-            const response = await fetch('/upload', {
-                method: 'POST',
-                body: formData,
-            });
+            for (const file of files) {
+                const response = await fetch(`/upload-stream?filename=${encodeURIComponent(file.name)}`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/octet-stream' },
+                    body: file,
+                });
 
-            const data = await response.json();
+                if (!response.ok) {
+                    let message = `Server returned ${response.status}`;
+                    try {
+                        message = (await response.json()).error || message;
+                    } catch (e) {
+                        // Not a JSON error body
+                    }
+                    failure = message;
+                    break;
+                }
 
-            if (data.error) {
-                showStatus(data.error, 'error');
-                return;
+                const result = await response.json();
+                added.push(...result.tracks);
             }
-
-            if (data.tracks && data.tracks.length > 0) {
-                tracks.push(...data.tracks);
+        } catch (error) {
+            failure = 'Upload failed: ' + error.message;
+        } finally {
+            if (added.length > 0) {
+                tracks.push(...added);
                 renderTracks();
                 updateCapacity();
 
                 // Focus first new track
-                const firstNewIndex = tracks.length - data.tracks.length;
-                selectTrack(firstNewIndex);
-
-                showStatus(`Added ${data.tracks.length} track(s)`);
-            } else {
-                showStatus('No valid audio files found', 'warning');
+                selectTrack(tracks.length - added.length);
             }
-        } catch (error) {
-            showStatus('Upload failed: ' + error.message, 'error');
+        }
+
+        if (failure) {
+            const suffix = added.length > 0 ? ` (added ${added.length} track(s) before the error)` : '';
+            showStatus(failure + suffix, 'error');
+        } else if (added.length > 0) {
+            showStatus(`Added ${added.length} track(s)`);
+        } else {
+            showStatus('No valid audio files found', 'warning');
         }
     }
 
@@ -755,7 +770,7 @@
     }
 
     // Start burn process using Server-Sent Events
-    function startBurn() {
+    async function startBurn() {
         if (isBurning || tracks.length === 0) return;
 
         isBurning = true;
@@ -767,8 +782,26 @@
         burnProgress.value = 0;
         progressText.textContent = 'Starting burn process...';
 
-        const url = `/burn?dummy=${dummyMode.checked}&gaps=${trackGaps.checked}`;
-        const eventSource = new EventSource(url);
+        // Burn runs in the background on the server; we just follow its progress
+        let jobId;
+        try {
+            const response = await fetch(`/burn?dummy=${dummyMode.checked}&gaps=${trackGaps.checked}&normalize=${normalize.checked}`, {
+                method: 'POST',
+            });
+            const data = await response.json();
+            if (data.error && !data.id) {
+                throw new Error(data.error);
+            }
+            jobId = data.id;  // Also set when joining a burn already in progress
+        } catch (error) {
+            isBurning = false;
+            progressContainer.hidden = true;
+            renderTracks();
+            showStatus('Failed to start burn: ' + error.message, 'error');
+            return;
+        }
+
+        const eventSource = new EventSource(`/burn-progress/${jobId}`);
 
         eventSource.addEventListener('progress', (e) => {
             const data = JSON.parse(e.data);
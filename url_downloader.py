@@ -1,11 +1,16 @@
 """URL download utilities using audio-url-transformer and yt-dlp."""
 
+import functools
 import hashlib
 import json
+import os
 import re
+import shutil
 import threading
+import time
 import uuid
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import Callable
@@ -13,6 +18,8 @@ from urllib.parse import urlparse
 
 import requests
 import yt_dlp
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from audio_url_transformer import AudioURLTransformer
 
 from audio_utils import get_duration
@@ -20,12 +27,60 @@ from audio_utils import get_duration
 # Shared transformer instance
 _transformer = AudioURLTransformer()
 
+# Shared HTTP session so connections (and TLS handshakes) are reused across downloads
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0"})
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
 # Minimum duration to consider a valid audio file (in seconds)
 MIN_DURATION_SECONDS = 1.0
 
+# Read size for direct downloads, and minimum gap between progress callbacks
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+PROGRESS_INTERVAL_SECONDS = 0.1
+
+# (connect, read) timeout for direct downloads, so a stalled server can't
+# hold one of the few download workers forever
+DOWNLOAD_TIMEOUT_SECONDS = (10, 60)
+
+# URL path suffixes that mean the URL is the audio file itself (no page to read)
+AUDIO_EXTENSIONS = {".mp3", ".m4a", ".wav", ".flac", ".ogg", ".opus", ".aac"}
+
+# Audio file extensions yt-dlp may leave in the cache, most preferred first
+# (the mp3 postprocessor output beats any leftover original download)
+_YTDLP_EXTENSIONS = ("mp3", "m4a", "webm", "opus", "ogg", "wav")
+
+# Maximum bytes of a page read when looking for its title
+PAGE_HEAD_LIMIT = 64 * 1024
+
 # URL regex pattern for http/https URLs
 URL_PATTERN = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
 
+# URL normalization: tracking params to drop, YouTube short forms to expand
+_NORMALIZE_RE = re.compile(
+    r'(?P<tracking>[?&](?:utm_\w+|fbclid|ref|feature)=[^&]*)'
+    r'|(?P<youtube>(?:www\.)?youtu\.be/|(?:www\.)?youtube\.com/shorts/)'
+)
+_YOUTUBE_RE = re.compile(r'(youtube\.com|youtu\.be)/')
+
+# Filename sanitizing: unsafe characters (and control chars) become "_"
+_SAFE_TABLE = str.maketrans({c: "_" for c in '<>:"/\\|?*' + "".join(chr(i) for i in range(32))})
+_COLLAPSE_RE = re.compile(r'[_\s]+')
+
+# Page title: og:title meta (either attribute order) or <title> tag
+_TITLE_RE = re.compile(
+    r'<meta\s+property=["\']og:title["\']\s+content=["\']([^"\']+)["\']'
+    r'|<meta\s+content=["\']([^"\']+)["\']\s+property=["\']og:title["\']'
+    r'|<title>([^<]+)</title>',
+    re.IGNORECASE,
+)
+
 
 class JobStatus(Enum):
     PENDING = "pending"
@@ -54,12 +109,31 @@ class DownloadJob:
     message: str = ""
     result: DownloadResult | None = None
     error: str | None = None
+    future: Future | None = field(default=None, repr=False)
 
 
 # Global job registry (GIL-safe for basic dict operations)
 _jobs: dict[str, DownloadJob] = {}
 _jobs_lock = threading.Lock()
 
+# Signalled whenever any job's state changes; the version counter lets
+# waiters detect updates that happened before they started waiting
+_jobs_changed = threading.Condition(_jobs_lock)
+_jobs_version = 0
+
+# Bounded worker pool for downloads, so pasting many URLs doesn't start
+# dozens of yt-dlp/ffmpeg processes at once
+MAX_CONCURRENT_DOWNLOADS = 4
+_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS, thread_name_prefix="dl")
+
+# Page title lookups run alongside downloads (separate pool so a download
+# worker never waits on work queued behind other downloads)
+_title_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="title")
+
+# Parsed cache indexes: index path -> (file mtime_ns, index dict)
+_index_cache: dict[Path, tuple[int | None, dict]] = {}
+_index_lock = threading.Lock()
+
 
 def parse_urls(text: str) -> list[str]:
     """Extract http/https URLs from text.
@@ -73,6 +147,11 @@ def parse_urls(text: str) -> list[str]:
     return URL_PATTERN.findall(text)
 
 
+def _normalize_match(match: re.Match) -> str:
+    return '' if match.lastgroup == 'tracking' else 'youtube.com/watch?v='
+
+
+@functools.lru_cache(maxsize=4096)
 def normalize_url(url: str) -> str:
     """Normalize URL for cache lookup.
 
@@ -84,16 +163,14 @@ def normalize_url(url: str) -> str:
     Returns:
         Normalized URL string
     """
-    # Remove common tracking params
-    url = re.sub(r'[?&](utm_\w+|fbclid|ref|feature)=[^&]*', '', url)
-    # Normalize YouTube URLs
-    url = re.sub(r'(?:www\.)?youtu\.be/', 'youtube.com/watch?v=', url)
-    url = re.sub(r'(?:www\.)?youtube\.com/shorts/', 'youtube.com/watch?v=', url)
+    # Remove common tracking params and normalize YouTube URLs in one pass
+    url = _NORMALIZE_RE.sub(_normalize_match, url)
     # Remove trailing slashes
     url = url.rstrip('/')
     return url
 
 
+@functools.lru_cache(maxsize=4096)
 def url_hash(url: str) -> str:
     """Generate cache key from URL.
 
@@ -101,10 +178,14 @@ def url_hash(url: str) -> str:
         url: URL to hash
 
     Returns:
-        First 16 chars of SHA256 hash
+        16 hex char BLAKE2b digest
     """
-    normalized = normalize_url(url)
-    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+    return hashlib.blake2b(normalize_url(url).encode(), digest_size=8).hexdigest()
+
+
+def _legacy_url_hash(url: str) -> str:
+    """Cache key used by older versions (truncated SHA256), for lookups only."""
+    return hashlib.sha256(normalize_url(url).encode()).hexdigest()[:16]
 
 
 def safe_filename(title: str, max_length: int = 100) -> str:
@@ -118,9 +199,9 @@ def safe_filename(title: str, max_length: int = 100) -> str:
         Safe filename string
     """
     # Replace problematic characters
-    safe = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', title)
+    safe = title.translate(_SAFE_TABLE)
     # Collapse multiple underscores/spaces
-    safe = re.sub(r'[_\s]+', '_', safe)
+    safe = _COLLAPSE_RE.sub('_', safe)
     # Remove leading/trailing underscores and dots
     safe = safe.strip('_.')
     # Truncate
@@ -129,8 +210,47 @@ def safe_filename(title: str, max_length: int = 100) -> str:
     return safe or 'untitled'
 
 
+def _index_path(cache_dir: Path) -> Path:
+    return cache_dir / "index.json"
+
+
+def _load_index_locked(index_path: Path) -> dict:
+    """Get the in-memory index, re-reading the file only if it changed."""
+    try:
+        mtime = index_path.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+
+    cached = _index_cache.get(index_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    index = {}
+    if mtime is not None:
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            pass
+    _index_cache[index_path] = (mtime, index)
+    return index
+
+
+def _save_index_locked(index_path: Path, index: dict) -> None:
+    """Write the index atomically and remember it as the cached copy."""
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, index_path)
+    _index_cache[index_path] = (index_path.stat().st_mtime_ns, index)
+
+
 def load_cache_index(cache_dir: Path) -> dict:
-    """Load cache index from disk.
+    """Load cache index.
+
+    The parsed index is kept in memory and only re-read when index.json
+    changes on disk. Treat the returned dict as read-only.
 
     Args:
         cache_dir: Cache directory path
@@ -138,27 +258,31 @@ def load_cache_index(cache_dir: Path) -> dict:
     Returns:
         Dict mapping URL hashes to cache entries
     """
-    index_path = cache_dir / "index.json"
-    if index_path.exists():
-        try:
-            with open(index_path) as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {}
+    with _index_lock:
+        return _load_index_locked(_index_path(cache_dir))
 
 
 def save_cache_index(cache_dir: Path, index: dict) -> None:
-    """Save cache index to disk.
+    """Save cache index to disk (atomically, via a temp file and rename).
 
     Args:
         cache_dir: Cache directory path
         index: Cache index dict
     """
-    index_path = cache_dir / "index.json"
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    with open(index_path, "w") as f:
-        json.dump(index, f, indent=2)
+    with _index_lock:
+        _save_index_locked(_index_path(cache_dir), index)
+
+
+def _set_cache_entry(cache_dir: Path, cache_key: str, entry: dict | None) -> None:
+    """Add, replace or (with entry=None) remove a single cache index entry."""
+    index_path = _index_path(cache_dir)
+    with _index_lock:
+        index = _load_index_locked(index_path)
+        if entry is None:
+            index.pop(cache_key, None)
+        else:
+            index[cache_key] = entry
+        _save_index_locked(index_path, index)
 
 
 def get_cached(url: str, cache_dir: Path) -> DownloadResult | None:
@@ -171,19 +295,22 @@ def get_cached(url: str, cache_dir: Path) -> DownloadResult | None:
     Returns:
         DownloadResult if cached and file exists, None otherwise
     """
-    cache_key = url_hash(url)
     index = load_cache_index(cache_dir)
+    cache_key = url_hash(url)
+    entry = index.get(cache_key)
+    if entry is None:
+        # Entries written before the switch to BLAKE2b keys
+        cache_key = _legacy_url_hash(url)
+        entry = index.get(cache_key)
 
-    if cache_key not in index:
+    if entry is None:
         return None
 
-    entry = index[cache_key]
     filepath = cache_dir / entry["filename"]
 
     if not filepath.exists():
         # Stale cache entry
-        del index[cache_key]
-        save_cache_index(cache_dir, index)
+        _set_cache_entry(cache_dir, cache_key, None)
         return None
 
     return DownloadResult(
@@ -201,28 +328,59 @@ def _download_direct_url(
 ) -> None:
     """Download a direct audio URL with progress.
 
+    The file is written under a temporary name and renamed into place, so
+    an existing file at output_path (which may be hardlinked into the
+    playlist) is replaced by a new inode rather than rewritten.
+
     Args:
         url: Direct URL to audio file
         output_path: Where to save the file
         on_progress: Callback(percent, message)
     """
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0"}
-    response = requests.get(url, headers=headers, stream=True)
+    tmp_path = output_path.with_name(output_path.name + ".part")
+    try:
+        _fetch_to_file(url, tmp_path, on_progress)
+        os.replace(tmp_path, output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _fetch_to_file(
+    url: str,
+    output_path: Path,
+    on_progress: Callable[[float, str], None] | None,
+) -> None:
+    """Stream a URL's body into output_path (see _download_direct_url)."""
+    response = _SESSION.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT_SECONDS)
     response.raise_for_status()
 
+    if on_progress is None:
+        # Nothing to report: let shutil move the bytes
+        response.raw.decode_content = True
+        with open(output_path, "wb") as f:
+            shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+        return
+
     total = int(response.headers.get("content-length", 0))
     downloaded = 0
+    last_report = time.monotonic()
+    last_percent = -1
 
     with open(output_path, "wb") as f:
-        for chunk in response.iter_content(chunk_size=8192):
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
             f.write(chunk)
             downloaded += len(chunk)
-            if on_progress and total > 0:
-                percent = (downloaded / total) * 100
-                on_progress(percent, f"Downloading: {percent:.0f}%")
+            if total > 0:
+                # Only report whole-percent changes, and not too often
+                percent = int(downloaded * 100 / total)
+                if percent != last_percent:
+                    now = time.monotonic()
+                    if now - last_report >= PROGRESS_INTERVAL_SECONDS:
+                        last_report = now
+                        last_percent = percent
+                        on_progress(percent, f"Downloading: {percent}%")
 
-    if on_progress:
-        on_progress(100.0, "Download complete")
+    on_progress(100.0, "Download complete")
 
 
 def _title_from_url(url: str) -> str:
@@ -249,22 +407,28 @@ def _get_page_title(url: str) -> str | None:
         Title string or None if not found
     """
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0"}
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        html = response.text
-
-        # Try og:title first
-        match = re.search(r'<meta\s+property=["\']og:title["\']\s+content=["\']([^"\']+)["\']', html)
-        if not match:
-            match = re.search(r'<meta\s+content=["\']([^"\']+)["\']\s+property=["\']og:title["\']', html)
-        if match:
-            return match.group(1).strip()
+        # Titles live in <head>, so only read the start of the page
+        with _SESSION.get(url, stream=True, timeout=10) as response:
+            response.raise_for_status()
+            head = bytearray()
+            for chunk in response.iter_content(chunk_size=8192):
+                head += chunk
+                if len(head) >= PAGE_HEAD_LIMIT or b"</head>" in head[-(len(chunk) + 7):]:
+                    break
+            html = head.decode(response.encoding or "utf-8", errors="replace")
+
+        # Single scan: og:title wins wherever it appears, else the first <title>
+        title_tag = None
+        for match in _TITLE_RE.finditer(html):
+            og_title = match.group(1) or match.group(2)
+            if og_title:
+                return og_title.strip()
+            if title_tag is None:
+                title_tag = match.group(3)
 
         # Fall back to <title> tag
-        match = re.search(r'<title>([^<]+)</title>', html, re.IGNORECASE)
-        if match:
-            title = match.group(1).strip()
+        if title_tag:
+            title = title_tag.strip()
             # Clean up common suffixes
             for suffix in [" - Suno", " | Suno", " - SoundCloud", " - YouTube"]:
                 if title.endswith(suffix):
@@ -311,7 +475,7 @@ def download_url(
 
     # Try audio-url-transformer first (but not for YouTube - yt-dlp handles it better)
     direct_url = None
-    is_youtube = bool(re.search(r'(youtube\.com|youtu\.be)/', url))
+    is_youtube = bool(_YOUTUBE_RE.search(url))
     if not is_youtube and _transformer.is_audio_url(url):
         try:
             if on_progress:
@@ -329,10 +493,16 @@ def download_url(
         output_file = cache_dir / f"{cache_key}{ext}"
 
         def progress_cb(percent, message):
-            if on_progress:
-                on_progress(job_id, percent, message)
+            on_progress(job_id, percent, message)
+
+        # Direct audio links already have a good title in their path; for
+        # pages, fetch the title while the audio downloads
+        title_future = None
+        if Path(urlparse(url).path).suffix.lower() not in AUDIO_EXTENSIONS:
+            title_future = _title_pool.submit(_get_page_title, url)
 
-        _download_direct_url(direct_url, output_file, progress_cb)
+        # Without a listener, skip per-chunk progress and copy in bulk
+        _download_direct_url(direct_url, output_file, progress_cb if on_progress else None)
 
         # Get duration from the file using ffprobe
         duration = get_duration(output_file) or 0.0
@@ -343,17 +513,15 @@ def download_url(
             raise ValueError(f"Audio too short ({duration:.1f}s) - likely invalid URL")
 
         # Try to get title from page, fall back to URL
-        title = _get_page_title(url) or _title_from_url(url)
+        title = (title_future and title_future.result()) or _title_from_url(url)
 
         # Update cache index
-        index = load_cache_index(cache_dir)
-        index[cache_key] = {
+        _set_cache_entry(cache_dir, cache_key, {
             "url": url,
             "title": title,
             "duration": duration,
             "filename": output_file.name,
-        }
-        save_cache_index(cache_dir, index)
+        })
 
         if on_progress:
             on_progress(job_id, 100.0, f"Complete: {title}")
@@ -366,16 +534,21 @@ def download_url(
         )
 
     # Fall back to yt-dlp
+    last_percent = -1
+
     def progress_hook(d):
+        nonlocal last_percent
         if d["status"] == "downloading":
             total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
             downloaded = d.get("downloaded_bytes", 0)
             if total > 0:
-                percent = (downloaded / total) * 100
+                percent = int(downloaded * 100 / total)
             else:
                 percent = 0
-            if on_progress:
-                on_progress(job_id, percent, f"Downloading: {percent:.0f}%")
+            # Only report whole-percent changes
+            if on_progress and percent != last_percent:
+                last_percent = percent
+                on_progress(job_id, percent, f"Downloading: {percent}%")
         elif d["status"] == "finished":
             if on_progress:
                 on_progress(job_id, 100.0, "Processing audio...")
@@ -398,19 +571,24 @@ def download_url(
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         info = ydl.extract_info(url, download=True)
 
-    # Find the downloaded file (yt-dlp may have converted to mp3)
+    # Find the downloaded file (yt-dlp may have converted to mp3). yt-dlp
+    # reports the final path; otherwise scan the cache dir once.
     output_file = None
-    for ext in ["mp3", "m4a", "webm", "opus", "ogg", "wav"]:
-        candidate = cache_dir / f"{cache_key}.{ext}"
+    requested = info.get("requested_downloads") or []
+    if requested and requested[0].get("filepath"):
+        candidate = Path(requested[0]["filepath"])
         if candidate.exists():
             output_file = candidate
-            break
+    if output_file is None:
+        matches = [p for p in cache_dir.glob(f"{cache_key}.*") if p.suffix[1:] in _YTDLP_EXTENSIONS]
+        if matches:
+            output_file = min(matches, key=lambda p: _YTDLP_EXTENSIONS.index(p.suffix[1:]))
 
     if output_file is None:
         raise RuntimeError("Download completed but output file not found")
 
     title = info.get("title", "Unknown")
-    duration = info.get("duration", 0.0) or 0.0
+    duration = info.get("duration") or (requested[0].get("duration") if requested else None) or 0.0
 
     # If yt-dlp didn't provide duration, get it from the file
     if duration == 0.0:
@@ -422,14 +600,12 @@ def download_url(
         raise ValueError(f"Audio too short ({duration:.1f}s) - likely invalid URL")
 
     # Update cache index
-    index = load_cache_index(cache_dir)
-    index[cache_key] = {
+    _set_cache_entry(cache_dir, cache_key, {
         "url": url,
         "title": title,
         "duration": duration,
         "filename": output_file.name,
-    }
-    save_cache_index(cache_dir, index)
+    })
 
     if on_progress:
         on_progress(job_id, 100.0, f"Complete: {title}")
@@ -455,23 +631,58 @@ def get_job(job_id: str) -> DownloadJob | None:
         return _jobs.get(job_id)
 
 
+def _notify_job_changed() -> None:
+    """Wake up anyone waiting in wait_for_job_update."""
+    global _jobs_version
+    with _jobs_changed:
+        _jobs_version += 1
+        _jobs_changed.notify_all()
+
+
+def job_update_version() -> int:
+    """Get the current job update counter (for use with wait_for_job_update)."""
+    with _jobs_lock:
+        return _jobs_version
+
+
+def wait_for_job_update(version: int, timeout: float | None = None) -> int:
+    """Block until some job changes after the given update version.
+
+    Args:
+        version: Last version seen by the caller
+        timeout: Maximum seconds to wait
+
+    Returns:
+        Current update version (unchanged if the wait timed out)
+    """
+    with _jobs_changed:
+        _jobs_changed.wait_for(lambda: _jobs_version != version, timeout)
+        return _jobs_version
+
+
 def start_download(
     url: str,
     cache_dir: Path,
     on_complete: Callable[[DownloadJob], None] | None = None,
 ) -> str:
-    """Start a background download job.
+    """Queue a background download job.
+
+    At most MAX_CONCURRENT_DOWNLOADS run at once; the rest stay pending
+    until a worker is free.
 
     Args:
         url: URL to download
         cache_dir: Cache directory path
-        on_complete: Callback when download completes (success or failure)
+        on_complete: Callback when the download finishes (success or
+            failure), run on the worker thread before the job's final
+            status is published. job.result is set on success (None on
+            failure); an exception from the callback fails the job.
 
     Returns:
         Job ID string
     """
     job_id = str(uuid.uuid4())
-    job = DownloadJob(id=job_id, url=url)
+    job = DownloadJob(id=job_id, url=url, message="Queued")
 
     with _jobs_lock:
         _jobs[job_id] = job
@@ -479,29 +690,37 @@ def start_download(
     def run():
         job.status = JobStatus.DOWNLOADING
         job.message = "Starting download..."
+        _notify_job_changed()
 
         def on_progress(jid, percent, message):
             job.progress = percent
             job.message = message
             if percent >= 100:
                 job.status = JobStatus.PROCESSING
+            _notify_job_changed()
 
+        notified = False
         try:
             result = download_url(url, cache_dir, job_id, on_progress)
+            job.result = result
+            # Let the caller finish with the result before it's announced
+            if on_complete:
+                notified = True
+                on_complete(job)
             job.status = JobStatus.COMPLETE
             job.progress = 100.0
-            job.result = result
             job.message = f"Complete: {result.title}"
         except Exception as e:
             job.status = JobStatus.FAILED
+            job.result = None
             job.error = str(e)
             job.message = f"Failed: {e}"
+            if on_complete and not notified:
+                on_complete(job)
 
-        if on_complete:
-            on_complete(job)
+        _notify_job_changed()
 
-    thread = threading.Thread(target=run, daemon=True)
-    thread.start()
+    job.future = _pool.submit(run)
 
     return job_id
 
@@ -513,7 +732,9 @@ def cleanup_job(job_id: str) -> None:
         job_id: Job ID to remove
     """
     with _jobs_lock:
-        _jobs.pop(job_id, None)
+        job = _jobs.pop(job_id, None)
+    if job is not None and job.future is not None:
+        job.future.cancel()  # No-op unless it is still queued
 
 
 def get_all_jobs() -> dict[str, DownloadJob]: